@@ -2,8 +2,10 @@
 
 from fastapi import APIRouter
 
-from app.api.v1 import transcribe, transcribe_ws
+from app.api.v1 import traces, transcribe, transcribe_ws, transcriptions
 
 router = APIRouter(prefix="/api/v1", tags=["v1"])
 router.include_router(transcribe.router, prefix="", tags=["transcribe"])
 router.include_router(transcribe_ws.router, prefix="", tags=["transcribe"])
+router.include_router(traces.router, prefix="", tags=["traces"])
+router.include_router(transcriptions.router, prefix="", tags=["transcriptions"])
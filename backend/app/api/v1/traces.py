@@ -0,0 +1,28 @@
+"""实时转写会话时间线导出：GET /api/v1/transcribe/traces。"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+
+from app import json_codec
+from app.services import session_trace
+
+router = APIRouter()
+
+
+@router.get("/transcribe/traces")
+def list_traces() -> list[dict]:
+    """最近被采样的流式会话（新的在前）。"""
+    return session_trace.list_traces()
+
+
+@router.get("/transcribe/traces/{session_id}")
+def get_trace(
+    session_id: str,
+    format: str = Query("json", pattern="^(json|chrome)$", description="json 紧凑时间线；chrome 为 Chrome trace 格式"),
+) -> Response:
+    """导出单个会话时间线，时间戳为相对会话开始的微秒数。"""
+    tracer = session_trace.get_trace(session_id)
+    if tracer is None:
+        raise HTTPException(status_code=404, detail="trace 不存在或已淘汰")
+    payload = tracer.to_chrome_trace() if format == "chrome" else tracer.to_json()
+    return Response(content=json_codec.dumps_bytes(payload), media_type="application/json")
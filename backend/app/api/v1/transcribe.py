@@ -2,28 +2,131 @@
 
 import asyncio
 import tempfile
+from collections.abc import AsyncIterator
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from loguru import logger
 from sqlalchemy.orm import Session
 
+from app import json_codec
 from app.config import settings
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.transcription import TranscriptionRecord
-from app.schemas.transcription import TranscribeResponse
+from app.schemas.transcription import TranscribeResponse, TranscribeResult
 from app.services import ark_correction, volcengine
 
 router = APIRouter()
 
 
+def _save_record(
+    db: Session, result: TranscribeResult, final_text: str, audio_size: int
+) -> TranscribeResponse:
+    """持久化转写记录并返回响应。"""
+    record = TranscriptionRecord(
+        engine="volcengine",
+        text=final_text,
+        emotion=result.emotion,
+        event=result.event,
+        lang=result.lang,
+        audio_size=audio_size,
+    )
+    db.add(record)
+    db.commit()
+    db.refresh(record)
+    logger.debug(f"{record.id=} {record.text=}")
+
+    return TranscribeResponse(
+        id=record.id,
+        text=record.text,
+        emotion=record.emotion,
+        event=record.event,
+        lang=record.lang,
+        engine=record.engine,
+    )
+
+
+async def _transcribe_with_correction(
+    tmp_path: Path, *, effect: bool
+) -> tuple[TranscribeResult, str]:
+    """
+    ASR 与纠错流水线：边接收识别结果边按句纠错，返回 (ASR 结果, 纠错后全文)。
+    开启 asr_hedge 时 ASR 走对冲路径（整段结果一次到达），结果再交给按句纠错，
+    使纠错请求同样受对冲保护并计入 /transcribe/hedge/stats。
+    """
+    corrector = ark_correction.SentenceCorrector()
+    try:
+        if settings.asr_hedge.enabled:
+            result = await volcengine.transcribe_volcengine(tmp_path, effect=effect)
+            corrector.feed(result.text)
+            return result, await corrector.finish()
+        texts: list[str] = []
+        async for t in volcengine.transcribe_volcengine_iter(tmp_path, effect=effect):
+            texts.append(t)
+            corrector.feed(t)
+        result = TranscribeResult(text="".join(texts).strip())
+        logger.info(f"ASR(豆包) {len(result.text)=}")
+        return result, await corrector.finish()
+    finally:
+        corrector.cancel()
+
+
+def _ndjson(payload: dict) -> bytes:
+    return json_codec.dumps_bytes(payload) + b"\n"
+
+
+async def _transcribe_ndjson(
+    tmp_path: Path, *, effect: bool, use_llm: bool, audio_size: int
+) -> AsyncIterator[bytes]:
+    """
+    NDJSON 流式转写，每行一个事件：
+    ``{"event": "asr", "text": 当前识别全文}``（可多次）→
+    ``{"event": "corrected", "text": 纠错后全文}``（仅纠错时）→
+    ``{"event": "result", "record": TranscribeResponse}``；出错时为 ``{"event": "error", "detail": ...}``。
+    """
+    corrector = ark_correction.SentenceCorrector() if use_llm and settings.volcengine.ark_valid else None
+    try:
+        texts: list[str] = []
+        async for t in volcengine.transcribe_volcengine_iter(tmp_path, effect=effect):
+            texts.append(t)
+            if corrector is not None:
+                corrector.feed(t)
+            yield _ndjson({"event": "asr", "text": "".join(texts)})
+        result = TranscribeResult(text="".join(texts).strip())
+        logger.info(f"ASR(豆包) {len(result.text)=}")
+
+        final_text = result.text
+        if corrector is not None:
+            final_text = await corrector.finish()
+            logger.info(f"Ark 纠错后 len(final_text)={len(final_text)}")
+            yield _ndjson({"event": "corrected", "text": final_text})
+
+        # 响应体流式发送期间依赖注入的会话可能已关闭，单独开会话
+        db = SessionLocal()
+        try:
+            resp = _save_record(db, result, final_text, audio_size)
+        finally:
+            db.close()
+        yield _ndjson({"event": "result", "record": resp.model_dump()})
+    except Exception as e:
+        # 响应头已发出，任何异常（含上游连接/网络错误）都只能以 error 事件告知客户端
+        logger.warning(f"{e=}")
+        yield _ndjson({"event": "error", "detail": str(e) or type(e).__name__})
+    finally:
+        if corrector is not None:
+            corrector.cancel()
+        tmp_path.unlink(missing_ok=True)
+
+
 @router.post("/transcribe", response_model=TranscribeResponse)
 async def transcribe(
     audio: UploadFile = File(...),
     effect: bool = Query(False, description="是否开启效果转写/去口语化（语义顺滑）"),
     use_llm: bool = Query(False, description="是否启用 LLM 纠错，由后端配置决定"),
+    stream: bool = Query(False, description="以 NDJSON 流式返回：asr 增量 → corrected → result"),
     db: Session = Depends(get_db),
-) -> TranscribeResponse:
+) -> TranscribeResponse | StreamingResponse:
     """上传 WAV 音频，豆包转写；use_llm 且 Ark 配置有效时做纠错，结果持久化后返回。"""
     if not audio.filename or not audio.filename.lower().endswith((".wav", ".wave")):
         raise HTTPException(status_code=400, detail="仅支持 WAV 格式")
@@ -39,41 +142,34 @@ async def transcribe(
         tmp.write(content)
         tmp_path = Path(tmp.name)
 
+    if stream:
+        return StreamingResponse(
+            _transcribe_ndjson(tmp_path, effect=effect, use_llm=use_llm, audio_size=audio_size),
+            media_type="application/x-ndjson",
+        )
+
     try:
         loop = asyncio.get_running_loop()
         start = loop.time()
-        result = await volcengine.transcribe_volcengine(tmp_path, effect=effect)
-        elapsed = loop.time() - start
-        logger.info(f"volcengine {elapsed=:.2f}s {len(result.text)=}")
-
-        final_text = result.text
         if use_llm and settings.volcengine.ark_valid:
-            final_text = await ark_correction.correct_full(result.text, history="")
-            logger.info(f"Ark 纠错后 len(final_text)={len(final_text)}")
+            result, final_text = await _transcribe_with_correction(tmp_path, effect=effect)
+            elapsed = loop.time() - start
+            logger.info(f"volcengine+Ark {elapsed=:.2f}s {len(result.text)=} {len(final_text)=}")
+        else:
+            result = await volcengine.transcribe_volcengine(tmp_path, effect=effect)
+            elapsed = loop.time() - start
+            logger.info(f"volcengine {elapsed=:.2f}s {len(result.text)=}")
+            final_text = result.text
 
-        record = TranscriptionRecord(
-            engine="volcengine",
-            text=final_text,
-            emotion=result.emotion,
-            event=result.event,
-            lang=result.lang,
-            audio_size=audio_size,
-        )
-        db.add(record)
-        db.commit()
-        db.refresh(record)
-        logger.debug(f"{record.id=} {record.text=}")
-
-        return TranscribeResponse(
-            id=record.id,
-            text=record.text,
-            emotion=record.emotion,
-            event=record.event,
-            lang=record.lang,
-            engine=record.engine,
-        )
+        return _save_record(db, result, final_text, audio_size)
     except (ValueError, FileNotFoundError, RuntimeError) as e:
         logger.warning(f"{e=}")
         raise HTTPException(status_code=400, detail=str(e)) from e
     finally:
         tmp_path.unlink(missing_ok=True)
+
+
+@router.get("/transcribe/hedge/stats")
+def hedge_stats() -> dict:
+    """非流式转写（含纠错）对冲计数：请求数、已触发、对冲胜出次数及当前触发延迟；NDJSON 流式转写不对冲。"""
+    return {"enabled": settings.asr_hedge.enabled, **volcengine.asr_hedge.stats()}
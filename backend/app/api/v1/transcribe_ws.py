@@ -1,13 +1,17 @@
 """WebSocket 流式转写：豆包 ASR，可选 Ark 纠错。"""
 
 import asyncio
+import secrets
 from collections.abc import AsyncIterator
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 from loguru import logger
 
+from app import json_codec
 from app.config import settings
-from app.services import ark_correction, volcengine
+from app.services import session_trace, volcengine
+from app.services.session_trace import Tracer
+from app.services.correction_scheduler import scheduler as correction_scheduler
 
 router = APIRouter()
 CORRECTION_WINDOW_SEC = 1.8
@@ -15,51 +19,139 @@ CHECK_INTERVAL_CAP_SEC = 5.0
 CORR_WAIT_TIMEOUT_SEC = 60.0
 IDLE_TIMEOUT_MIN = 1
 IDLE_TIMEOUT_MAX = 600
+PROTOCOL_FULL = 1  # 每帧下发全文
+PROTOCOL_DELTA = 2  # 下发 (offset, text) 增量 + 定期全文快照
+WS_CLOSE_ABNORMAL = 1006  # 连接异常中断（无关闭帧）；仅此及读取出错时保留会话等待重连
 
 
-async def _audio_stream_from_ws(ws: WebSocket) -> AsyncIterator[bytes]:
-    """从 WebSocket 读取二进制 PCM。"""
+async def _audio_stream_from_ws(
+    ws: WebSocket, tracer: Tracer = session_trace.NULL_TRACER
+) -> AsyncIterator[bytes]:
+    """从 WebSocket 读取二进制 PCM；tracer 在收到每个包时记录 pcm_in。"""
     try:
         while True:
-            yield await ws.receive_bytes()
+            chunk = await ws.receive_bytes()
+            tracer.record("pcm_in", size=len(chunk))
+            yield chunk
     except (WebSocketDisconnect, RuntimeError):
         pass
+    tracer.record("pcm_eof")
+
+
+async def _audio_stream_from_queue(queue: "asyncio.Queue[bytes | None]") -> AsyncIterator[bytes]:
+    """从队列读取 PCM，None 表示音频结束；用于可恢复会话，跨连接持续供给同一 ASR 流。"""
+    while (chunk := await queue.get()) is not None:
+        yield chunk
 
 
 async def _send_json(ws: WebSocket, payload: dict) -> None:
     try:
         logger.debug(f"[send] {payload}")
-        await ws.send_json(payload)
+        await ws.send_text(json_codec.dumps(payload))
     except Exception as e:
         logger.debug(f"[send] error: {e=}")
 
 
+def _common_prefix_len(a: str, b: str) -> int:
+    """两字符串公共前缀长度。"""
+    if b.startswith(a):
+        return len(a)
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _utf16_len(s: str) -> int:
+    """UTF-16 码元数（Dart / JS 的字符串长度）；BMP 外字符（如 emoji）占 2。"""
+    return len(s.encode("utf-16-le")) // 2
+
+
+class TextFrameEncoder:
+    """
+    把当前全文编码为下发帧。
+
+    - ``PROTOCOL_FULL``：``{"text": 全文, "is_final": bool}``（兼容旧客户端）。
+    - ``PROTOCOL_DELTA``：相对上一帧已下发文本的增量
+      ``{"seq": n, "op": "delta", "offset": k, "text": 替换内容, "is_final": false}``，
+      客户端执行 ``text = text[:offset] + 替换内容``；offset 按 UTF-16 码元计，
+      与 Dart / JS 的字符串下标一致；
+      首帧、每 snapshot_interval 帧及 is_final 帧为全文快照
+      ``{"seq": n, "op": "snapshot", "text": 全文, "is_final": bool}``，用于重同步。
+      seq 连续递增，客户端发现跳号时丢弃本地文本、等待下一快照。
+    """
+
+    def __init__(self, protocol: int = PROTOCOL_FULL, snapshot_interval: int = 20) -> None:
+        self.protocol = protocol
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.seq = 0
+        self._base = ""
+        self._last_snapshot_seq = 0
+
+    def force_snapshot(self) -> None:
+        """下一帧强制为全文快照（如客户端重连后）。"""
+        self._last_snapshot_seq = 0
+
+    def encode(self, text: str, is_final: bool = False) -> dict:
+        if self.protocol != PROTOCOL_DELTA:
+            return {"text": text, "is_final": is_final}
+        self.seq += 1
+        if (
+            is_final
+            or self._last_snapshot_seq == 0
+            or self.seq - self._last_snapshot_seq >= self.snapshot_interval
+        ):
+            self._last_snapshot_seq = self.seq
+            frame = {"seq": self.seq, "op": "snapshot", "text": text, "is_final": is_final}
+        else:
+            prefix = _common_prefix_len(self._base, text)
+            frame = {
+                "seq": self.seq,
+                "op": "delta",
+                "offset": _utf16_len(text[:prefix]),
+                "text": text[prefix:],
+                "is_final": False,
+            }
+        self._base = text
+        return frame
+
+
 class TranscribeStreamPipeline:
     """
     ASR 流 + 可选纠错；超过 idle_timeout_sec 无新识别内容则发送 closed 并结束。
-    共享状态用实例属性维护，避免 nonlocal。
+    共享状态用实例属性维护，避免 nonlocal。被采样的会话由 tracer 记录时间线（未传入时按采样率新建）。
+    ws 为 None 表示客户端已断开、等待重连（可恢复会话），期间不下发且暂停空闲检测。
     """
 
     def __init__(
         self,
-        ws: WebSocket,
+        ws: WebSocket | None,
         audio_stream: AsyncIterator[bytes],
         *,
         effect: bool = False,
         use_llm: bool = False,
         idle_timeout_sec: float = 5.0,
+        protocol: int = PROTOCOL_FULL,
+        tracer: Tracer | None = None,
     ) -> None:
         self.ws = ws
+        self.tracer = tracer if tracer is not None else session_trace.start_session()
         self.audio_stream = audio_stream
         self.effect = effect
         self.idle_timeout_sec = idle_timeout_sec
         self.use_correction = settings.volcengine.ark_valid and use_llm
         self._loop = asyncio.get_running_loop()
+        self.encoder = TextFrameEncoder(
+            protocol, snapshot_interval=settings.transcribe_ws_snapshot_interval
+        )
 
         self.current_asr = ""
         self.asr_done = False
         self.last_sent = ""  # 上次已处理的 ASR snap，用于去重
         self.last_sent_text = ""  # 上次实际下发给客户端的文本（纠错后），用于 is_final
+        self.final_sent = False  # 已发出 is_final 帧（断开期间发出的需重连后补发）
+        self.closed_reason: str | None = None
         self.stable_history: list[str] = []
         self.last_speech_at: float = self._loop.time()
         self.last_asr_update_at: float = self._loop.time()
@@ -69,19 +161,55 @@ class TranscribeStreamPipeline:
         self._corr_task: asyncio.Task[None] | None = None
         self._idle_task: asyncio.Task[None] | None = None
 
+    async def _send(self, payload: dict) -> None:
+        if self.ws is not None:
+            await _send_json(self.ws, payload)
+
+    async def _send_frame(self, text: str, is_final: bool = False) -> None:
+        frame = self.encoder.encode(text, is_final=is_final)
+        # 断开期间的帧不会到达客户端，单独记录，避免时间线误导
+        event = "frame_out" if self.ws is not None else "frame_dropped"
+        self.tracer.record(event, len=len(frame["text"]), is_final=is_final)
+        await self._send(frame)
+
+    def detach(self) -> None:
+        """客户端断开：停止下发，保留 ASR 与纠错状态。"""
+        self.ws = None
+        self.tracer.record("detach")
+
+    async def attach(self, ws: WebSocket) -> None:
+        """
+        客户端重连：恢复下发并补发当前全文快照，空闲计时从此刻重新开始。
+        若断开期间已结束，则补发 is_final 帧及 closed。
+        """
+        self.ws = ws
+        self.last_asr_update_at = self._loop.time()
+        self.tracer.record("attach")
+        self.encoder.force_snapshot()
+        if self.final_sent:
+            await self._send_frame(self.last_sent_text, is_final=True)
+        elif self.last_sent_text:
+            await self._send_frame(self.last_sent_text)
+        if self.closed_reason is not None:
+            await self._send({"closed": True, "reason": self.closed_reason})
+
     async def _consume_asr(self) -> None:
         try:
             async for full_text in volcengine.transcribe_volcengine_stream(
-                self.audio_stream, effect=self.effect
+                self.audio_stream, effect=self.effect, tracer=self.tracer
             ):
+                self.tracer.record("asr_partial", len=len(full_text))
                 self.current_asr = full_text
+                if self.use_correction:
+                    correction_scheduler.replace(self, full_text)
                 self.last_asr_update_at = self._loop.time()
         finally:
+            self.tracer.record("asr_done")
             self.asr_done = True
 
     async def _send_chunk(self, text: str, snap: str) -> None:
         """发送一段文本并更新 last_sent / last_sent_text / last_speech_at。"""
-        await _send_json(self.ws, {"text": text, "is_final": False})
+        await self._send_frame(text)
         self.last_sent = snap
         self.last_sent_text = text
         self.last_speech_at = self._loop.time()
@@ -101,7 +229,14 @@ class TranscribeStreamPipeline:
                     history = (
                         "\n".join(self.stable_history[-3:]) if self.stable_history else ""
                     )
-                    text = await ark_correction.correct_full(snap, history=history)
+                    self.tracer.record("correction_start", len=len(snap))
+                    try:
+                        # 排队期间若 ASR 更新，调度器会替换为最新快照，snap 以实际纠错的为准
+                        snap, text = await correction_scheduler.submit(
+                            self, snap, history=history, final=done_or_closing
+                        )
+                    finally:
+                        self.tracer.record("correction_end")
                     if self.asr_done:
                         self.stable_history.append(text)
                 else:
@@ -112,19 +247,23 @@ class TranscribeStreamPipeline:
                 await self._send_chunk(snap, snap)
             if self.idle_timeout_requested.is_set() or self.asr_done:
                 break
-        await _send_json(
-            self.ws, {"text": self.last_sent_text or "", "is_final": True}
-        )
+        self.final_sent = True
+        await self._send_frame(self.last_sent_text or "", is_final=True)
 
     async def _idle_check_loop(self) -> None:
         check_interval = min(CHECK_INTERVAL_CAP_SEC, self.idle_timeout_sec)
         while True:
             await asyncio.sleep(check_interval)
+            if self.ws is None:
+                if self.final_sent:
+                    return  # 断开期间已结束，无需再等空闲超时
+                continue
             if self._loop.time() - self.last_asr_update_at >= self.idle_timeout_sec:
                 logger.debug(
                     f"transcribe ws idle timeout (no speech) after {self.idle_timeout_sec}s"
                 )
                 self.idle_timeout_requested.set()
+                self.tracer.record("idle_timeout")
                 if self._corr_task is not None:
                     try:
                         await asyncio.wait_for(
@@ -137,9 +276,8 @@ class TranscribeStreamPipeline:
                             await self._corr_task
                         except asyncio.CancelledError:
                             pass
-                await _send_json(
-                    self.ws, {"closed": True, "reason": "idle_timeout"}
-                )
+                self.closed_reason = "idle_timeout"
+                await self._send({"closed": True, "reason": self.closed_reason})
                 if self._asr_task is not None:
                     self._asr_task.cancel()
                 return
@@ -149,6 +287,8 @@ class TranscribeStreamPipeline:
         self._asr_task = asyncio.create_task(self._consume_asr())
         self._corr_task = asyncio.create_task(self._correction_loop())
         self._idle_task = asyncio.create_task(self._idle_check_loop())
+        if self.tracer.enabled:
+            logger.info(f"transcribe ws trace session_id={self.tracer.session_id}")
         try:
             await asyncio.gather(
                 self._asr_task, self._corr_task, self._idle_task
@@ -163,6 +303,127 @@ class TranscribeStreamPipeline:
                 self._idle_task,
                 return_exceptions=True,
             )
+        finally:
+            self.tracer.record("close")
+
+
+class ResumableSession:
+    """
+    可恢复会话：pipeline 在后台任务中运行，音频经队列供给，上游 ASR 连接与已下发文本跨 WebSocket 保留。
+    客户端异常断开后保留 grace 秒（pipeline 在此期间结束也保留，重连时补发最终帧），
+    期间携带 token 重连即可从 bytes_received 处续传 PCM；超时则取消并移除。
+    """
+
+    def __init__(self, pipeline: TranscribeStreamPipeline, audio_queue: "asyncio.Queue[bytes | None]") -> None:
+        self.token = secrets.token_urlsafe(16)
+        self.pipeline = pipeline
+        self.audio_queue = audio_queue
+        self.bytes_received = 0
+        self.run_task: asyncio.Task[None] = asyncio.create_task(pipeline.run())
+        self.pump_task: asyncio.Task[int | None] | None = None
+        self._expire_handle: asyncio.TimerHandle | None = None
+
+    def feed(self, ws: WebSocket, chunk: bytes) -> None:
+        """仅接收当前挂载连接的 PCM；已被接管的旧连接上的数据直接丢弃。"""
+        if self.pipeline.ws is not ws:
+            return
+        self.pipeline.tracer.record("pcm_in", size=len(chunk))
+        self.bytes_received += len(chunk)
+        self.audio_queue.put_nowait(chunk)
+
+    async def resume(self, ws: WebSocket) -> None:
+        """
+        挂载新连接：先摘下旧连接并停止其读取，再按 bytes_received 下发 resume_offset，
+        最后补发快照，保证客户端续传偏移之后不会有旧连接的数据混入。
+        """
+        if self._expire_handle is not None:
+            self._expire_handle.cancel()
+            self._expire_handle = None
+        old = self.pipeline.ws
+        if old is not None and old is not ws:
+            # 旧连接尚未被发现断开（半开），由新连接接管
+            self.pipeline.detach()
+            if self.pump_task is not None:
+                self.pump_task.cancel()
+            try:
+                await old.close()
+            except Exception:
+                pass
+        await _send_json(ws, {"session": self.token, "resume_offset": self.bytes_received})
+        await self.pipeline.attach(ws)
+
+    def detach(self, grace_sec: float) -> None:
+        self.pipeline.detach()
+        self._expire_handle = asyncio.get_running_loop().call_later(grace_sec, self._expire)
+
+    def end(self, grace_sec: float) -> None:
+        """
+        客户端主动关闭：不再接受重连，向上游发送音频结束并让 pipeline 自然收尾；
+        grace 秒后仍未结束则兜底取消。
+        """
+        _sessions.pop(self.token, None)
+        self.pipeline.detach()
+        self.pipeline.tracer.record("pcm_eof")
+        self.audio_queue.put_nowait(None)
+        self._expire_handle = asyncio.get_running_loop().call_later(grace_sec, self._expire)
+
+    def close(self) -> None:
+        """结束会话：取消 pipeline 并移除。"""
+        if self._expire_handle is not None:
+            self._expire_handle.cancel()
+            self._expire_handle = None
+        self.run_task.cancel()
+        _sessions.pop(self.token, None)
+
+    def _expire(self) -> None:
+        logger.info(f"resumable session expired {self.token=}")
+        self._expire_handle = None
+        self.close()
+
+
+# 可恢复会话，token -> session；会话关闭或过期时移除
+_sessions: dict[str, ResumableSession] = {}
+
+
+async def _pump_audio(ws: WebSocket, session: ResumableSession) -> int | None:
+    """读取客户端 PCM 写入会话队列，返回断开时的关闭码。"""
+    try:
+        while True:
+            session.feed(ws, await ws.receive_bytes())
+    except WebSocketDisconnect as e:
+        return e.code
+    except RuntimeError:
+        return None
+
+
+async def _serve_resumable(ws: WebSocket, session: ResumableSession) -> None:
+    """在当前连接上服务可恢复会话，直到会话结束或客户端断开。"""
+    pump = asyncio.create_task(_pump_audio(ws, session))
+    session.pump_task = pump
+    done, _ = await asyncio.wait({pump, session.run_task}, return_when=asyncio.FIRST_COMPLETED)
+    if session.pipeline.ws is not ws:
+        pump.cancel()
+        return  # 已被新连接接管
+    if session.run_task in done:
+        # 结果已在当前连接上下发，会话可移除
+        pump.cancel()
+        await asyncio.gather(pump, return_exceptions=True)
+        if not session.run_task.cancelled():
+            e = session.run_task.exception()
+            if e is not None and not isinstance(e, (WebSocketDisconnect, RuntimeError)):
+                logger.warning(f"stream error: {e=}")
+                await _send_json(ws, {"text": "", "is_final": True, "error": str(e)})
+        session.close()
+        return
+    code = pump.result()
+    grace = float(settings.transcribe_ws_resume_grace_sec)
+    if code is not None and code != WS_CLOSE_ABNORMAL:
+        # 1000 / 1001 / 1005（如 Dart sink.close() 不带状态码）等均视为主动关闭
+        logger.debug(f"resumable session closed by client {session.token=} {code=}")
+        session.end(grace)
+        return
+    logger.info(f"resumable session detached {session.token=} {code=} {grace=}")
+    session.detach(grace)
 
 
 @router.websocket("/transcribe/stream")
@@ -173,14 +434,28 @@ async def transcribe_stream(
     idle_timeout_sec: int | None = Query(
         None, description="无新识别内容超过该秒数则关闭，不传则用服务端配置"
     ),
+    protocol: int = Query(
+        PROTOCOL_FULL,
+        ge=PROTOCOL_FULL,
+        le=PROTOCOL_DELTA,
+        description="输出协议版本：1 每帧全文；2 增量 (offset, text) + 定期全文快照",
+    ),
+    resumable: bool = Query(False, description="是否启用可恢复会话（断线重连续传）"),
+    session_token: str | None = Query(None, description="重连时携带的会话 token"),
 ) -> None:
     """
     豆包流式转写。客户端发送 PCM（16k/16bit/mono），服务端返回
     ``{"text": "当前全文", "is_final": false}``。Ark 配置有效且 use_llm 为 true 时做纠错（use_llm 由后端配置决定）。
+    protocol=2 时改为增量帧，格式见 :class:`TextFrameEncoder`。
+
+    resumable=true 时首帧为 ``{"session": token, "resume_offset": 0}``；异常断开后
+    transcribe_ws_resume_grace_sec 秒内携带 session_token 重连，服务端返回
+    ``{"session": token, "resume_offset": 已收字节数}`` 及当前全文快照，客户端从该偏移续传 PCM。
+    token 无效或已过期时返回 ``{"closed": true, "reason": "session_expired"}``。
     """
     await ws.accept()
     logger.info(
-        f"transcribe stream ws connected {settings.volcengine.ark_valid=} {effect=} {use_llm=}"
+        f"transcribe stream ws connected {settings.volcengine.ark_valid=} {effect=} {use_llm=} {protocol=}"
     )
 
     if idle_timeout_sec is not None:
@@ -191,13 +466,47 @@ async def transcribe_stream(
     else:
         idle_timeout = float(settings.transcribe_ws_idle_timeout_sec)
         logger.info(f"transcribe ws idle timeout from config: {idle_timeout}s")
+
+    if session_token is not None or resumable:
+        try:
+            if session_token is not None:
+                session = _sessions.get(session_token)
+                if session is None:
+                    await _send_json(ws, {"closed": True, "reason": "session_expired"})
+                    return
+                await session.resume(ws)
+                logger.info(f"resumable session resumed {session.token=} {session.bytes_received=}")
+            else:
+                audio_queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+                pipeline = TranscribeStreamPipeline(
+                    None,
+                    _audio_stream_from_queue(audio_queue),
+                    effect=effect,
+                    use_llm=use_llm,
+                    idle_timeout_sec=idle_timeout,
+                    protocol=protocol,
+                )
+                session = ResumableSession(pipeline, audio_queue)
+                _sessions[session.token] = session
+                await session.resume(ws)
+            await _serve_resumable(ws, session)
+        finally:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+        return
+
     try:
+        tracer = session_trace.start_session()
         pipeline = TranscribeStreamPipeline(
             ws,
-            _audio_stream_from_ws(ws),
+            _audio_stream_from_ws(ws, tracer),
             effect=effect,
             use_llm=use_llm,
             idle_timeout_sec=idle_timeout,
+            protocol=protocol,
+            tracer=tracer,
         )
         await pipeline.run()
     except (WebSocketDisconnect, RuntimeError) as e:
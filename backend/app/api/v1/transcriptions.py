@@ -0,0 +1,105 @@
+"""转写记录导出：GET /api/v1/transcriptions/export，NDJSON / CSV 流式输出。"""
+
+import csv
+import io
+from collections.abc import Iterator
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app import json_codec
+from app.database import SessionLocal
+from app.models.transcription import TranscriptionRecord
+
+router = APIRouter()
+
+EXPORT_BATCH_SIZE = 500
+EXPORT_COLUMNS = (
+    TranscriptionRecord.id,
+    TranscriptionRecord.engine,
+    TranscriptionRecord.text,
+    TranscriptionRecord.emotion,
+    TranscriptionRecord.event,
+    TranscriptionRecord.lang,
+    TranscriptionRecord.audio_size,
+    TranscriptionRecord.created_at,
+)
+EXPORT_FIELDS = [c.key for c in EXPORT_COLUMNS]
+
+
+def _to_utc_naive(dt: datetime | None) -> datetime | None:
+    """created_at 以 UTC 无时区存储；带时区的参数先转换为 UTC。"""
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _iter_rows(
+    start: datetime | None, end: datetime | None, engine: str | None
+) -> Iterator[dict]:
+    """
+    按 id 键集分页，每批一个短读事务：内存只占一批，且不在整个导出期间占用 SQLite 锁
+    （单个长游标会一直持有共享锁，阻塞写入提交）。
+    """
+    stmt = select(*EXPORT_COLUMNS).order_by(TranscriptionRecord.id).limit(EXPORT_BATCH_SIZE)
+    if start is not None:
+        stmt = stmt.where(TranscriptionRecord.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(TranscriptionRecord.created_at < end)
+    if engine:
+        stmt = stmt.where(TranscriptionRecord.engine == engine)
+
+    last_id = 0
+    while True:
+        with SessionLocal() as db:
+            rows = db.execute(stmt.where(TranscriptionRecord.id > last_id)).all()
+        if not rows:
+            return
+        for row in rows:
+            item = row._asdict()
+            item["created_at"] = item["created_at"].isoformat() if item["created_at"] else None
+            yield item
+        last_id = rows[-1].id
+
+
+def _ndjson_lines(rows: Iterator[dict]) -> Iterator[bytes]:
+    for item in rows:
+        yield json_codec.dumps_bytes(item) + b"\n"
+
+
+def _csv_lines(rows: Iterator[dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for item in rows:
+        writer.writerow(item)
+        if buf.tell() >= 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+@router.get("/transcriptions/export")
+def export_transcriptions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="导出格式：ndjson 或 csv"),
+    start: datetime | None = Query(None, description="created_at 起始（含），ISO 8601"),
+    end: datetime | None = Query(None, description="created_at 截止（不含），ISO 8601"),
+    engine: str | None = Query(None, description="按引擎过滤，如 volcengine"),
+) -> StreamingResponse:
+    """
+    流式导出转写记录，按 id 升序。同步生成器由 Starlette 在线程池中迭代，不阻塞事件循环；
+    内存占用与表大小无关。
+    """
+    rows = _iter_rows(_to_utc_naive(start), _to_utc_naive(end), engine)
+    if format == "csv":
+        body, media_type = _csv_lines(rows), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _ndjson_lines(rows), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transcriptions.{format}"'},
+    )
@@ -33,6 +33,15 @@ class VolcengineConfig(BaseModel):
         return bool(self.ark_api_key and self.ark_model_id)
 
 
+class AsrHedgeConfig(BaseModel):
+    """非流式豆包 ASR 对冲请求：主连接超过延迟分位数无结果时并发第二路，先完成者胜出。"""
+
+    enabled: bool = Field(default=False, description="是否启用对冲")
+    percentile: float = Field(default=0.95, description="触发延迟取历史耗时（扣除上传时长）的该分位数")
+    min_delay_sec: float = Field(default=2.0, description="触发延迟下限，样本不足时亦用此值")
+    max_rate: float = Field(default=0.1, description="对冲预算：对冲次数占请求数的上限比例")
+
+
 class Settings(BaseSettings):
     """应用配置，优先级：环境变量 > config.yaml > 默认值。"""
 
@@ -40,7 +49,22 @@ class Settings(BaseSettings):
 
     database_url: str = Field(default="sqlite:///./byvo.db")
     volcengine: VolcengineConfig = Field(default_factory=VolcengineConfig)
+    asr_hedge: AsrHedgeConfig = Field(default_factory=AsrHedgeConfig)
     transcribe_ws_idle_timeout_sec: int = Field(default=5, description="实时转写：无新识别内容超过该秒数则自动关闭连接")
+    transcribe_ws_snapshot_interval: int = Field(
+        default=20, description="实时转写增量协议（protocol=2）：每隔多少帧下发一次全文快照"
+    )
+    transcribe_ws_resume_grace_sec: int = Field(
+        default=15, description="实时转写可恢复会话：客户端异常断开后保留会话等待重连的秒数"
+    )
+    correction_max_concurrency: int = Field(
+        default=8, description="进程级 Ark 纠错并发上限（所有实时转写会话共享）"
+    )
+    transcribe_trace_sample_rate: float = Field(
+        default=0.0, description="实时转写会话时间线追踪采样率，0 关闭，1 全部追踪"
+    )
+    transcribe_trace_buffer_size: int = Field(default=2048, description="每个被追踪会话保留的最近事件数")
+    transcribe_trace_keep_sessions: int = Field(default=32, description="内存中保留的最近被追踪会话数")
 
     @classmethod
     def settings_customise_sources(
@@ -0,0 +1,30 @@
+"""JSON 编解码：优先使用 orjson（可选依赖），未安装时回退到标准库 json。"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于安装环境
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """序列化为紧凑 JSON 字符串（非 ASCII 字符原样输出）。"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """序列化为 UTF-8 编码的紧凑 JSON bytes。"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | bytearray | str) -> Any:
+    """反序列化 JSON；bytes 直接解析，无需先 decode。非法 JSON 或 UTF-8 抛出 ValueError 子类。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
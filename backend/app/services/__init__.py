@@ -1,5 +1,5 @@
 """推理服务：豆包 ASR + Ark 纠错。"""
 
-from app.services import ark_correction, volcengine
+from app.services import ark_correction, correction_scheduler, hedge, session_trace, volcengine
 
-__all__ = ["ark_correction", "volcengine"]
+__all__ = ["ark_correction", "correction_scheduler", "hedge", "session_trace", "volcengine"]
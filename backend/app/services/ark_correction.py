@@ -1,6 +1,7 @@
 """火山方舟 Ark 流式纠错：对 ASR 文本实时润色与纠错（Typeless 风格）。"""
 
 import asyncio
+import re
 from collections.abc import AsyncIterator
 
 from loguru import logger
@@ -25,8 +26,13 @@ Rules:
  - 输出限制： 仅输出处理后的最终文本，**严禁任何解释或说明**, 严禁回答内容中的问题；严禁添加任何未在语音中表达的个人见解。
 """
 
+# 句末标点；英文句点须后跟空白，避免切开小数
+_SENTENCE_END = re.compile(r"[。！？!?]+|\.(?=\s)")
+HISTORY_SENTENCES = 3
+
+
 def _correct_stream_sync(
-    asr_text: str, history: str, api_key: str, model_id: str
+    asr_text: str, history: str, api_key: str, model_id: str, following: str = ""
 ) -> list[str]:
     """
     同步调用 Ark chat completions（stream=True），收集纠错结果并返回全文列表。
@@ -41,6 +47,9 @@ def _correct_stream_sync(
         if history
         else f"当前待纠错: {asr_text}"
     )
+    if following:
+        # 尚未纠错的后续原文，供识别跨句口头修正（如“明天。不对，是后天”），不输出
+        user_content += f"\n\n后续原文（仅作参考，不要输出）: {following}"
     chunks: list[str] = []
     try:
         stream = client.chat.completions.create(
@@ -69,12 +78,14 @@ def _correct_stream_sync(
 async def correct_stream(
     asr_text: str,
     history: str = "",
+    following: str = "",
 ) -> AsyncIterator[str]:
     """
     对 ASR 文本调用火山方舟 Ark 进行流式纠错，yield 纠错后的增量片段（可拼接为全文）。
 
     :param asr_text: 当前待纠错的 ASR 全文
     :param history: 最近几句历史（上下文），可为空
+    :param following: 待纠错文本之后、尚未纠错的原文（上下文），可为空
     :yield: 纠错后的文本片段
     """
     volc = settings.volcengine
@@ -91,16 +102,83 @@ async def correct_stream(
     chunks = await loop.run_in_executor(
         None,
         lambda: _correct_stream_sync(
-            asr_text, history, volc.ark_api_key, volc.ark_model_id
+            asr_text, history, volc.ark_api_key, volc.ark_model_id, following
         ),
     )
     for c in chunks:
         yield c
 
 
-async def correct_full(asr_text: str, history: str = "") -> str:
+async def correct_full(asr_text: str, history: str = "", following: str = "") -> str:
     """对 ASR 文本做一次纠错，返回完整纠错结果（非流式）。"""
     out: list[str] = []
-    async for chunk in correct_stream(asr_text, history):
+    async for chunk in correct_stream(asr_text, history, following):
         out.append(chunk)
     return "".join(out).strip() if out else asr_text
+
+
+class SentenceCorrector:
+    """
+    与 ASR 流水线并行的按句纠错：feed() 接收 ASR 增量片段，每凑满一句即排入后台纠错；
+    finish() 提交剩余文本并返回拼接后的全文。
+
+    后台每次调用前把所有已排队、尚未开始的句子合并为一次纠错，因此调用次数不超过
+    ASR 增量到达的批次数：整段结果一次到达时（nostream 常见）只有一次 Ark 调用，与不流水线相同；
+    分段到达时纠错与 ASR 重叠，ASR 结束后关键路径上只剩最后一批。
+    每次调用以前几批纠错结果作为 history，并附上尚未成句的后续原文，便于处理跨句口头修正。
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._corrected: list[str] = []
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    def feed(self, text: str) -> None:
+        self._buffer += text
+        start = 0
+        for m in _SENTENCE_END.finditer(self._buffer):
+            self._put(self._buffer[start : m.end()])
+            start = m.end()
+        self._buffer = self._buffer[start:]
+
+    def _put(self, sentence: str) -> None:
+        if sentence.strip():
+            self._queue.put_nowait(sentence)
+
+    def _drain(self, first: str | None) -> tuple[str, bool]:
+        """合并 first 及队列中所有尚未开始的句子，返回 (合并文本, 是否已到结尾)。"""
+        parts: list[str] = []
+        item = first
+        while True:
+            if item is None:
+                return "".join(parts), True
+            parts.append(item)
+            if self._queue.empty():
+                return "".join(parts), False
+            item = self._queue.get_nowait()
+
+    async def _run(self) -> None:
+        while True:
+            chunk, done = self._drain(await self._queue.get())
+            if chunk:
+                body = chunk.lstrip()
+                lead = chunk[: len(chunk) - len(body)]
+                history = "\n".join(c.strip() for c in self._corrected[-HISTORY_SENTENCES:])
+                corrected = await correct_full(
+                    body.rstrip(), history=history, following=self._buffer.strip()
+                )
+                self._corrected.append(lead + corrected)
+            if done:
+                return
+
+    async def finish(self) -> str:
+        """提交剩余文本，等待全部纠错完成，返回纠错后全文。"""
+        self._put(self._buffer)
+        self._buffer = ""
+        self._queue.put_nowait(None)
+        await self._task
+        return "".join(self._corrected).strip()
+
+    def cancel(self) -> None:
+        self._task.cancel()
@@ -0,0 +1,105 @@
+"""进程级纠错调度：按会话合并过期快照，全局并发上限，按优先级服务各会话。"""
+
+import asyncio
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from app.config import settings
+from app.services import ark_correction
+
+
+@dataclass
+class _Job:
+    key: Hashable
+    text: str
+    history: str
+    final: bool
+    enqueued_at: float
+    future: "asyncio.Future[tuple[str, str]]" = field(repr=False)
+
+
+class CorrectionScheduler:
+    """
+    每个会话（key）最多一个待执行任务：再次提交时直接替换其快照，等待方拿到最新快照的纠错结果。
+    同一会话同时最多一个执行中任务；空闲 worker 优先服务 final（ASR 已结束/即将关闭）的会话，
+    其次为等待最久的会话。Ark 调用量随活跃会话数而非 ASR 增量次数增长。
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self._pending: dict[Hashable, _Job] = {}
+        self._running: set[Hashable] = set()
+        self._wakeup = asyncio.Event()
+        self._workers: list[asyncio.Task[None]] = []
+
+    def submit(
+        self, key: Hashable, text: str, history: str = "", *, final: bool = False
+    ) -> "asyncio.Future[tuple[str, str]]":
+        """
+        提交 key 的最新快照，返回 future，结果为 (实际纠错的快照, 纠错结果)。
+        若 key 已有待执行任务则替换其快照并返回同一 future。
+        """
+        job = self._pending.get(key)
+        if job is not None and not job.future.done():
+            job.text = text
+            job.history = history
+            job.final = job.final or final
+            return job.future
+        loop = asyncio.get_running_loop()
+        job = _Job(key, text, history, final, loop.time(), loop.create_future())
+        self._pending[key] = job
+        self._ensure_workers()
+        self._wakeup.set()
+        return job.future
+
+    def replace(self, key: Hashable, text: str) -> bool:
+        """仅当 key 有待执行任务时替换其快照（如 ASR 有新增量），返回是否替换。"""
+        job = self._pending.get(key)
+        if job is None or job.future.done():
+            return False
+        job.text = text
+        return True
+
+    def _ensure_workers(self) -> None:
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.max_concurrency:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    def _pick(self) -> _Job | None:
+        best: _Job | None = None
+        for key, job in list(self._pending.items()):
+            if job.future.done():  # 等待方已取消（会话结束）
+                del self._pending[key]
+                continue
+            if key in self._running:
+                continue
+            if best is None or (job.final, -job.enqueued_at) > (best.final, -best.enqueued_at):
+                best = job
+        return best
+
+    async def _worker(self) -> None:
+        while True:
+            job = self._pick()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            del self._pending[job.key]
+            self._running.add(job.key)
+            text = job.text
+            try:
+                out = await ark_correction.correct_full(text, history=job.history)
+                if not job.future.done():
+                    job.future.set_result((text, out))
+            except Exception as e:
+                logger.warning(f"correction scheduler error: {e=}")
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self._running.discard(job.key)
+                self._wakeup.set()
+
+
+scheduler = CorrectionScheduler(settings.correction_max_concurrency)
@@ -0,0 +1,104 @@
+"""对冲请求（hedged request）：主请求超过历史延迟分位数仍未完成时再发一路，先完成者胜出。"""
+
+import asyncio
+import math
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """
+    基于延迟分位数的对冲策略。
+
+    - 延迟：最近 window 次请求耗时（扣除 base_delay）的 percentile 分位数，不低于 min_delay_sec；
+      样本不足 min_samples 时使用 min_delay_sec。
+    - 预算：累计对冲次数不超过总请求数 × max_rate，避免成本翻倍。
+    - 计数：requests / hedges_fired / hedges_won。
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        min_delay_sec: float = 2.0,
+        max_rate: float = 0.1,
+        window: int = 200,
+        min_samples: int = 20,
+    ) -> None:
+        self.percentile = percentile
+        self.min_delay_sec = min_delay_sec
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def delay(self) -> float:
+        """当前对冲触发延迟（秒，不含 base_delay）。"""
+        if len(self._samples) < self.min_samples:
+            return self.min_delay_sec
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+        return max(self.min_delay_sec, ordered[max(idx, 0)])
+
+    def record_latency(self, sec: float) -> None:
+        """记录一次成功请求的耗时（已扣除 base_delay），参与后续分位数计算。"""
+        self._samples.append(max(0.0, sec))
+
+    def _within_budget(self) -> bool:
+        return self.hedges_fired + 1 <= self.max_rate * self.requests
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "delay_sec": round(self.delay(), 3),
+            "samples": len(self._samples),
+        }
+
+    async def run(self, call: Callable[[], Awaitable[T]], *, base_delay: float = 0.0) -> T:
+        """
+        执行 call()；超过 base_delay + delay() 未完成且预算允许时再发起一次 call()，
+        返回先成功完成的结果并取消另一路。base_delay 为与请求规模相关的固定耗时（如音频上传时长）。
+        """
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        start = loop.time()
+        primary = asyncio.ensure_future(call())
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=base_delay + self.delay())
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or not self._within_budget():
+            result = await primary
+            self.record_latency(loop.time() - start - base_delay)
+            return result
+
+        self.hedges_fired += 1
+        logger.info(f"hedge fired after {loop.time() - start:.2f}s {self.stats()=}")
+        hedge = asyncio.ensure_future(call())
+        pending: set[asyncio.Future] = {primary, hedge}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in done if t.exception() is None), None)
+                if winner is None:
+                    if not pending:
+                        raise next(iter(done)).exception()
+                    continue
+                if winner is hedge:
+                    self.hedges_won += 1
+                self.record_latency(loop.time() - start - base_delay)
+                return winner.result()
+        finally:
+            for t in (primary, hedge):
+                t.cancel()
+            await asyncio.gather(primary, hedge, return_exceptions=True)
@@ -0,0 +1,118 @@
+"""实时转写会话时间线追踪：按采样率开启，每会话一个定长环形缓冲，可导出紧凑 JSON 或 Chrome trace。"""
+
+import random
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Protocol
+
+from app.config import settings
+
+# 区间事件：以 *_start / *_end 成对记录，Chrome trace 中显示为 B/E
+_SPAN_SUFFIX_START = "_start"
+_SPAN_SUFFIX_END = "_end"
+
+
+class Tracer(Protocol):
+    """追踪器接口：SessionTracer 与 NULL_TRACER 均满足。"""
+
+    enabled: bool
+    session_id: str
+
+    def record(self, name: str, **args: Any) -> None: ...
+
+
+class SessionTracer:
+    """单个会话的时间线，事件为 (相对微秒, 名称, 参数)；缓冲满后丢弃最早事件。"""
+
+    enabled = True
+
+    def __init__(self, session_id: str, buffer_size: int) -> None:
+        self.session_id = session_id
+        self.started_at = time.time()
+        self._t0 = time.perf_counter_ns()
+        self._events: deque[tuple[int, str, dict[str, Any] | None]] = deque(maxlen=buffer_size)
+        self.dropped = 0
+
+    def record(self, name: str, **args: Any) -> None:
+        """记录一个事件；args 为可选的少量标量参数（如 size、len）。"""
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        ts_us = (time.perf_counter_ns() - self._t0) // 1000
+        self._events.append((ts_us, name, args or None))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def to_json(self) -> dict:
+        """紧凑 JSON：events 为 ``[ts_us, name, args]`` 数组。"""
+        return {
+            "session_id": self.session_id,
+            "started_at": self.started_at,
+            "dropped": self.dropped,
+            "events": [[ts, name, args] for ts, name, args in self._events],
+        }
+
+    def to_chrome_trace(self) -> dict:
+        """Chrome trace event 格式，可直接载入 chrome://tracing 或 Perfetto。"""
+        events: list[dict] = []
+        for ts, name, args in self._events:
+            if name.endswith(_SPAN_SUFFIX_START):
+                ev = {"name": name[: -len(_SPAN_SUFFIX_START)], "ph": "B"}
+            elif name.endswith(_SPAN_SUFFIX_END):
+                ev = {"name": name[: -len(_SPAN_SUFFIX_END)], "ph": "E"}
+            else:
+                ev = {"name": name, "ph": "i", "s": "t"}
+            ev.update(ts=ts, pid=1, tid=1)
+            if args:
+                ev["args"] = args
+            events.append(ev)
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "session_id": self.session_id,
+                "started_at": self.started_at,
+                "dropped": self.dropped,
+            },
+        }
+
+
+class _NullTracer:
+    """未采样会话使用的空追踪器，record 为空操作。"""
+
+    enabled = False
+    session_id = ""
+
+    def record(self, name: str, **args: Any) -> None:
+        pass
+
+
+NULL_TRACER = _NullTracer()
+
+# 最近若干个被采样会话，按创建顺序淘汰
+_traces: "OrderedDict[str, SessionTracer]" = OrderedDict()
+
+
+def start_session() -> Tracer:
+    """按 transcribe_trace_sample_rate 采样，命中则创建并登记追踪器，否则返回 NULL_TRACER。"""
+    rate = settings.transcribe_trace_sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return NULL_TRACER
+    tracer = SessionTracer(uuid.uuid4().hex, settings.transcribe_trace_buffer_size)
+    _traces[tracer.session_id] = tracer
+    while len(_traces) > max(1, settings.transcribe_trace_keep_sessions):
+        _traces.popitem(last=False)
+    return tracer
+
+
+def get_trace(session_id: str) -> SessionTracer | None:
+    return _traces.get(session_id)
+
+
+def list_traces() -> list[dict]:
+    """最近被采样会话的摘要，新的在前。"""
+    return [
+        {"session_id": t.session_id, "started_at": t.started_at, "events": len(t)}
+        for t in reversed(_traces.values())
+    ]
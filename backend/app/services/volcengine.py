@@ -1,10 +1,11 @@
 """豆包大模型语音识别服务，WebSocket 协议。"""
 
 import asyncio
-import json
+import math
 import struct
 import time
 from collections.abc import AsyncIterator
+from contextlib import aclosing
 from pathlib import Path
 
 import numpy as np
@@ -12,8 +13,11 @@ import soundfile as sf
 import websockets
 from loguru import logger
 
+from app import json_codec
 from app.config import settings
 from app.schemas.transcription import TranscribeResult
+from app.services.hedge import HedgePolicy
+from app.services.session_trace import NULL_TRACER, Tracer
 
 # 豆包 SAUC 协议常量
 WSS_NOSTREAM = "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel_nostream"
@@ -23,6 +27,23 @@ HEADER_AUDIO_ONLY = 0x11200000
 HEADER_AUDIO_LAST = 0x11220000
 CHUNK_BYTES = 3200 * 2  # 200ms at 16k/16bit
 TARGET_SR = 16000
+RECEIVE_TIMEOUT_SEC = 30  # 非流式：音频发送完毕后等待识别结果的最长时间
+SEND_INTERVAL_SEC = 0.05  # 相邻音频包发送间隔
+
+# 非流式转写的对冲策略，进程内共享延迟样本与计数
+asr_hedge = HedgePolicy(
+    percentile=settings.asr_hedge.percentile,
+    min_delay_sec=settings.asr_hedge.min_delay_sec,
+    max_rate=settings.asr_hedge.max_rate,
+)
+
+
+class ReceiveTimeoutError(asyncio.TimeoutError):
+    """非流式接收识别结果超时；text 为超时前已收到的部分结果。"""
+
+    def __init__(self, text: str) -> None:
+        super().__init__(f"ASR receive timeout {RECEIVE_TIMEOUT_SEC}s")
+        self.text = text
 
 
 def _uuid() -> str:
@@ -77,7 +98,7 @@ def _parse_asr_message(data: bytes) -> tuple[str | None, bool]:
     if len(data) < 12 + size:
         return None, flags == 0x03
     try:
-        obj = json.loads(data[12 : 12 + size].decode("utf-8"))
+        obj = json_codec.loads(data[12 : 12 + size])
         raw = obj.get("result")
         if isinstance(raw, dict):
             t = raw.get("text") or ""
@@ -86,7 +107,7 @@ def _parse_asr_message(data: bytes) -> tuple[str | None, bool]:
         else:
             t = ""
         return t if t else None, flags == 0x03
-    except (json.JSONDecodeError, KeyError):
+    except (ValueError, KeyError):
         return None, flags == 0x03
 
 
@@ -104,51 +125,126 @@ def _read_wav_16k_mono(path: str | Path) -> bytes:
     return pcm.tobytes()
 
 
-async def transcribe_volcengine(
+def _send_duration(pcm: bytes) -> float:
+    """按分包间隔估算上传整段 PCM 的耗时（秒）。"""
+    return max(0, math.ceil(len(pcm) / CHUNK_BYTES) - 1) * SEND_INTERVAL_SEC
+
+
+async def _transcribe_pcm_iter(
+    pcm: bytes, *, effect: bool, raise_on_timeout: bool = False
+) -> AsyncIterator[str]:
+    """
+    豆包非流式转写，边发送边接收：每收到一段识别结果即 yield（拼接即为全文）。
+    音频发送完毕后最多再等待 RECEIVE_TIMEOUT_SEC 秒，超时则结束；raise_on_timeout 时改为抛出 asyncio.TimeoutError。
+    """
+    volc = settings.volcengine
+    async with websockets.connect(WSS_NOSTREAM, additional_headers=_ws_headers(volc), proxy=None) as ws:
+        body = _request_body(effect)
+        await ws.send(_build_packet(HEADER_FULL_CLIENT, json_codec.dumps_bytes(body)))
+
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def _send_audio() -> None:
+            offset = 0
+            while offset < len(pcm):
+                take = min(CHUNK_BYTES, len(pcm) - offset)
+                is_last = offset + take >= len(pcm)
+                header = HEADER_AUDIO_LAST if is_last else HEADER_AUDIO_ONLY
+                await ws.send(_build_packet(header, pcm[offset : offset + take]))
+                offset += take
+                if not is_last:
+                    await asyncio.sleep(SEND_INTERVAL_SEC)
+
+        async def _receive_until_done() -> None:
+            try:
+                async for msg in ws:
+                    if not isinstance(msg, (bytes, bytearray)):
+                        continue
+                    t, done = _parse_asr_message(bytes(msg))
+                    if t:
+                        queue.put_nowait(t)
+                    if done:
+                        return
+            finally:
+                queue.put_nowait(None)
+
+        async def _send_then_wait() -> None:
+            await _send_audio()
+            try:
+                await asyncio.wait_for(recv_task, timeout=RECEIVE_TIMEOUT_SEC)
+            except asyncio.TimeoutError:
+                logger.warning(f"ASR receive timeout {RECEIVE_TIMEOUT_SEC}s")
+                if raise_on_timeout:
+                    raise
+
+        recv_task = asyncio.create_task(_receive_until_done())
+        send_task = asyncio.create_task(_send_then_wait())
+        try:
+            while (t := await queue.get()) is not None:
+                yield t
+            if recv_task.done() and not recv_task.cancelled() and recv_task.exception():
+                raise recv_task.exception()
+            await send_task
+        finally:
+            for task in (send_task, recv_task):
+                task.cancel()
+            await asyncio.gather(send_task, recv_task, return_exceptions=True)
+
+
+async def _transcribe_pcm(pcm: bytes, *, effect: bool) -> str:
+    """
+    收集全文。接收超时抛出 ReceiveTimeoutError（携带部分结果），
+    以便对冲时超时的一路计为失败、由另一路胜出。
+    """
+    texts: list[str] = []
+    try:
+        async for t in _transcribe_pcm_iter(pcm, effect=effect, raise_on_timeout=True):
+            texts.append(t)
+    except asyncio.TimeoutError as e:
+        raise ReceiveTimeoutError("".join(texts)) from e
+    return "".join(texts)
+
+
+async def transcribe_volcengine_iter(
     audio_path: str | Path,
     *,
     effect: bool = False,
-) -> TranscribeResult:
-    """豆包非流式转写：上传整段音频，返回全文。"""
+) -> AsyncIterator[str]:
+    """豆包非流式转写，每收到一段识别结果即 yield（拼接即为全文）。"""
     volc = settings.volcengine
     if not volc.valid:
         raise ValueError("豆包 API 未配置")
 
     pcm = _read_wav_16k_mono(audio_path)
     logger.debug(f"{len(pcm)=}")
+    async with aclosing(_transcribe_pcm_iter(pcm, effect=effect)) as it:
+        async for t in it:
+            yield t
 
-    async with websockets.connect(WSS_NOSTREAM, additional_headers=_ws_headers(volc), proxy=None) as ws:
-        body = _request_body(effect)
-        await ws.send(_build_packet(HEADER_FULL_CLIENT, json.dumps(body, ensure_ascii=False).encode()))
-
-        offset = 0
-        while offset < len(pcm):
-            take = min(CHUNK_BYTES, len(pcm) - offset)
-            is_last = offset + take >= len(pcm)
-            header = HEADER_AUDIO_LAST if is_last else HEADER_AUDIO_ONLY
-            await ws.send(_build_packet(header, pcm[offset : offset + take]))
-            offset += take
-            if not is_last:
-                await asyncio.sleep(0.05)
-
-        texts: list[str] = []
-
-        async def _receive_until_done() -> None:
-            async for msg in ws:
-                if not isinstance(msg, (bytes, bytearray)):
-                    continue
-                t, done = _parse_asr_message(bytes(msg))
-                if t:
-                    texts.append(t)
-                if done:
-                    return
 
-        try:
-            await asyncio.wait_for(_receive_until_done(), timeout=30)
-        except asyncio.TimeoutError:
-            logger.warning("ASR receive timeout 30s")
+async def transcribe_volcengine(
+    audio_path: str | Path,
+    *,
+    effect: bool = False,
+) -> TranscribeResult:
+    """豆包非流式转写：上传整段音频，返回全文。asr_hedge.enabled 时按对冲策略可能并发第二路连接。"""
+    volc = settings.volcengine
+    if not volc.valid:
+        raise ValueError("豆包 API 未配置")
 
-    result = "".join(texts).strip()
+    pcm = _read_wav_16k_mono(audio_path)
+    logger.debug(f"{len(pcm)=}")
+    try:
+        if settings.asr_hedge.enabled:
+            text = await asr_hedge.run(
+                lambda: _transcribe_pcm(pcm, effect=effect), base_delay=_send_duration(pcm)
+            )
+        else:
+            text = await _transcribe_pcm(pcm, effect=effect)
+    except ReceiveTimeoutError as e:
+        # 所有连接都超时：与不对冲时一致，返回已收到的部分结果
+        text = e.text
+    result = text.strip()
     logger.info(f"ASR(豆包) {len(result)=}")
     return TranscribeResult(text=result)
 
@@ -157,14 +253,15 @@ async def transcribe_volcengine_stream(
     audio_stream: AsyncIterator[bytes],
     *,
     effect: bool = False,
+    tracer: Tracer = NULL_TRACER,
 ) -> AsyncIterator[str]:
-    """流式转写：PCM 流 → 豆包 → yield 增量识别全文。"""
+    """流式转写：PCM 流 → 豆包 → yield 增量识别全文。tracer 记录上行音频包。"""
     volc = settings.volcengine
     if not volc.valid:
         raise ValueError("豆包 API 未配置")
 
     async with websockets.connect(WSS_STREAM, additional_headers=_ws_headers(volc), proxy=None) as ws:
-        await ws.send(_build_packet(HEADER_FULL_CLIENT, json.dumps(_request_body(effect), ensure_ascii=False).encode()))
+        await ws.send(_build_packet(HEADER_FULL_CLIENT, json_codec.dumps_bytes(_request_body(effect))))
 
         send_done = asyncio.Event()
 
@@ -177,11 +274,13 @@ async def transcribe_volcengine_stream(
                         pkt = _build_packet(HEADER_AUDIO_ONLY, bytes(buffer[:CHUNK_BYTES]))
                         del buffer[:CHUNK_BYTES]
                         await ws.send(pkt)
-                        await asyncio.sleep(0.05)
+                        tracer.record("upstream_packet", size=CHUNK_BYTES)
+                        await asyncio.sleep(SEND_INTERVAL_SEC)
                 if buffer:
                     await ws.send(_build_packet(HEADER_AUDIO_LAST, bytes(buffer)))
                 else:
                     await ws.send(_build_packet(HEADER_AUDIO_LAST, b""))
+                tracer.record("upstream_packet", size=len(buffer), last=True)
             except Exception as e:
                 logger.warning(f"stream send error: {e=}")
             finally:
@@ -0,0 +1,35 @@
+"""测试公共 fixture。"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import transcribe, transcriptions
+from app.database import Base, get_db
+from app.main import app
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """临时 SQLite 库：替换依赖注入会话与各模块直接使用的 SessionLocal，返回 sessionmaker。"""
+    from app.models import transcription  # noqa: F401 - 注册模型
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(transcribe, "SessionLocal", session_local)
+    monkeypatch.setattr(transcriptions, "SessionLocal", session_local)
+    app.dependency_overrides[get_db] = _get_db
+    yield session_local
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
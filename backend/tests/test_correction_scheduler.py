@@ -0,0 +1,91 @@
+"""进程级纠错调度器：快照替换、优先级、并发上限、取消。"""
+
+import asyncio
+
+import pytest
+
+from app.services import ark_correction
+from app.services.correction_scheduler import CorrectionScheduler
+
+
+@pytest.fixture
+def fake_correct(monkeypatch):
+    """替换 correct_full：记录调用，gate 放行前阻塞，结果为大写。"""
+    state = {"calls": [], "running": 0, "max_running": 0, "gate": None}
+
+    async def correct_full(text: str, history: str = "", following: str = "") -> str:
+        state["calls"].append(text)
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        try:
+            if state["gate"] is not None:
+                await state["gate"].wait()
+            await asyncio.sleep(0)
+            return text.upper()
+        finally:
+            state["running"] -= 1
+
+    monkeypatch.setattr(ark_correction, "correct_full", correct_full)
+    return state
+
+
+def test_replaced_snapshot_is_corrected(fake_correct):
+    async def main():
+        fake_correct["gate"] = asyncio.Event()
+        s = CorrectionScheduler(1)
+        fa = s.submit("a", "a1")
+        await asyncio.sleep(0)  # a1 开始执行，占满并发
+        fb = s.submit("b", "b1")
+        assert s.replace("b", "b2")
+        assert s.submit("b", "b3") is fb
+        fake_correct["gate"].set()
+        return await fa, await fb
+
+    assert asyncio.run(main()) == (("a1", "A1"), ("b3", "B3"))
+    assert fake_correct["calls"] == ["a1", "b3"]
+
+
+def test_final_picked_before_older_non_final(fake_correct):
+    async def main():
+        fake_correct["gate"] = asyncio.Event()
+        s = CorrectionScheduler(1)
+        fx = s.submit("x", "x")
+        await asyncio.sleep(0)
+        f_old = s.submit("old", "old")
+        f_final = s.submit("new", "new", final=True)
+        fake_correct["gate"].set()
+        await asyncio.gather(fx, f_old, f_final)
+
+    asyncio.run(main())
+    assert fake_correct["calls"] == ["x", "new", "old"]
+
+
+def test_global_concurrency_cap(fake_correct):
+    async def main():
+        fake_correct["gate"] = asyncio.Event()
+        s = CorrectionScheduler(2)
+        futures = [s.submit(k, k) for k in "abcde"]
+        await asyncio.sleep(0.01)
+        assert fake_correct["running"] == 2
+        fake_correct["gate"].set()
+        await asyncio.gather(*futures)
+
+    asyncio.run(main())
+    assert fake_correct["max_running"] == 2
+    assert sorted(fake_correct["calls"]) == list("abcde")
+
+
+def test_cancelled_waiter_job_is_dropped(fake_correct):
+    async def main():
+        fake_correct["gate"] = asyncio.Event()
+        s = CorrectionScheduler(1)
+        fx = s.submit("x", "x")
+        await asyncio.sleep(0)
+        fd = s.submit("d", "d")
+        fd.cancel()
+        fe = s.submit("e", "e")
+        fake_correct["gate"].set()
+        return await fx, await fe
+
+    assert asyncio.run(main()) == (("x", "X"), ("e", "E"))
+    assert fake_correct["calls"] == ["x", "e"]
@@ -0,0 +1,108 @@
+"""对冲策略：触发延迟、胜出计数、预算上限、失败回退。"""
+
+import asyncio
+
+import pytest
+
+from app.services.hedge import HedgePolicy
+
+# 永不返回的步骤：与触发延迟相差悬殊，结果不依赖调度时序
+NEVER = None
+
+
+def _call_factory(behaviours: list):
+    """
+    第 i 次调用依次执行 behaviours[i] 的各步骤，最后一项为返回值或要抛出的异常。
+    步骤：asyncio.Event 挂起直到被 set；NEVER 永不返回；float 休眠该秒数；callable 直接调用（如放行另一路）。
+    """
+    calls = {"n": 0}
+
+    async def call():
+        i = calls["n"]
+        calls["n"] += 1
+        *steps, result = behaviours[i]
+        for step in steps:
+            if step is NEVER:
+                await asyncio.Event().wait()
+            elif isinstance(step, asyncio.Event):
+                await step.wait()
+            elif isinstance(step, float):
+                await asyncio.sleep(step)
+            else:
+                step()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return call, calls
+
+
+def test_fast_primary_no_hedge():
+    policy = HedgePolicy(min_delay_sec=10.0, max_rate=1.0)
+    call, calls = _call_factory([("primary",)])
+    assert asyncio.run(policy.run(call)) == "primary"
+    assert calls["n"] == 1
+    assert policy.stats()["hedges_fired"] == 0
+    assert policy.stats()["samples"] == 1
+
+
+def test_slow_primary_hedge_wins():
+    policy = HedgePolicy(min_delay_sec=0.01, max_rate=1.0)
+    call, calls = _call_factory([(NEVER, "primary"), ("hedge",)])
+    assert asyncio.run(policy.run(call)) == "hedge"
+    assert calls["n"] == 2
+    assert policy.hedges_fired == 1 and policy.hedges_won == 1
+
+
+def test_failed_attempt_lets_other_win():
+    async def main():
+        primary_gate, hedge_gate = asyncio.Event(), asyncio.Event()
+        call, _ = _call_factory(
+            [
+                (primary_gate, hedge_gate.set, TimeoutError("stall")),
+                (primary_gate.set, hedge_gate, "hedge"),
+            ]
+        )
+        return await policy.run(call)
+
+    policy = HedgePolicy(min_delay_sec=0.01, max_rate=1.0)
+    assert asyncio.run(main()) == "hedge"
+    assert policy.hedges_won == 1
+
+
+def test_all_attempts_fail_raises():
+    async def main():
+        gate = asyncio.Event()
+        call, _ = _call_factory([(gate, TimeoutError("a")), (gate.set, TimeoutError("b"))])
+        await policy.run(call)
+
+    policy = HedgePolicy(min_delay_sec=0.01, max_rate=1.0)
+    with pytest.raises(TimeoutError):
+        asyncio.run(main())
+
+
+def test_budget_caps_hedge_rate():
+    policy = HedgePolicy(min_delay_sec=0.01, max_rate=0.5)
+
+    async def main():
+        results = []
+        for _ in range(4):
+            # 主请求耗时为触发延迟的 30 倍：预算内必然对冲，预算外等主请求完成
+            call, _ = _call_factory([(0.3, "primary"), ("hedge",)])
+            results.append(await policy.run(call))
+        return results
+
+    assert asyncio.run(main()) == ["primary", "hedge", "primary", "hedge"]
+    assert policy.requests == 4
+    assert policy.hedges_fired == 2 and policy.hedges_won == 2
+
+
+def test_delay_uses_percentile_after_min_samples():
+    policy = HedgePolicy(percentile=0.9, min_delay_sec=0.5, min_samples=10)
+    for _ in range(5):
+        policy.record_latency(0.1)
+    assert policy.delay() == 0.5
+    for i in range(1, 11):
+        policy.record_latency(float(i))
+    assert policy.delay() == 9.0
+    assert policy.stats()["samples"] == 15
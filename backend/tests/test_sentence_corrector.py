@@ -0,0 +1,85 @@
+"""按句纠错流水线：分句、排队合并、history / following 上下文、前导空白。"""
+
+import asyncio
+
+import pytest
+
+from app.services import ark_correction
+from app.services.ark_correction import SentenceCorrector
+
+
+@pytest.fixture
+def fake_correct(monkeypatch):
+    """替换 correct_full：记录 (text, history, following)，gate 放行前阻塞，结果加方括号。"""
+    state = {"calls": [], "gate": None}
+
+    async def correct_full(text: str, history: str = "", following: str = "") -> str:
+        state["calls"].append((text, history, following))
+        if state["gate"] is not None:
+            await state["gate"].wait()
+        return f"[{text}]"
+
+    monkeypatch.setattr(ark_correction, "correct_full", correct_full)
+    return state
+
+
+async def _settle() -> None:
+    """让后台纠错任务跑完当前可执行的部分。"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_sentences_split_with_history_and_following(fake_correct):
+    async def main():
+        c = SentenceCorrector()
+        c.feed("版本3.5发布。下")
+        await _settle()
+        c.feed("一句！还")
+        await _settle()
+        c.feed("没说完")
+        return await c.finish()
+
+    assert asyncio.run(main()) == "[版本3.5发布。][下一句！][还没说完]"
+    assert fake_correct["calls"] == [
+        ("版本3.5发布。", "", "下"),
+        ("下一句！", "[版本3.5发布。]", "还"),
+        ("还没说完", "[版本3.5发布。]\n[下一句！]", ""),
+    ]
+
+
+def test_queued_sentences_coalesce_into_one_call(fake_correct):
+    async def main():
+        fake_correct["gate"] = asyncio.Event()
+        c = SentenceCorrector()
+        c.feed("一。")
+        await _settle()  # 第一句开始纠错并阻塞
+        c.feed("二。三？四")
+        fake_correct["gate"].set()
+        return await c.finish()
+
+    assert asyncio.run(main()) == "[一。][二。三？四]"
+    assert [text for text, _, _ in fake_correct["calls"]] == ["一。", "二。三？四"]
+
+
+def test_whole_result_at_once_is_one_call(fake_correct):
+    async def main():
+        c = SentenceCorrector()
+        c.feed("你好。世界！")
+        return await c.finish()
+
+    assert asyncio.run(main()) == "[你好。世界！]"
+    assert len(fake_correct["calls"]) == 1
+
+
+def test_leading_whitespace_kept_between_sentences(fake_correct):
+    async def main():
+        c = SentenceCorrector()
+        c.feed("Hello world. ")
+        await _settle()
+        c.feed("How are you? ")
+        await _settle()
+        c.feed("   ")
+        return await c.finish()
+
+    assert asyncio.run(main()) == "[Hello world.] [How are you?]"
+    assert [text for text, _, _ in fake_correct["calls"]] == ["Hello world.", "How are you?"]
@@ -0,0 +1,67 @@
+"""会话时间线追踪：环形缓冲溢出计数、Chrome trace 导出、采样与保留数量。"""
+
+from collections import OrderedDict
+
+import pytest
+
+from app.config import settings
+from app.services import session_trace
+from app.services.session_trace import NULL_TRACER, SessionTracer
+
+
+def test_ring_buffer_keeps_latest_and_counts_dropped():
+    tracer = SessionTracer("s", buffer_size=3)
+    for i in range(5):
+        tracer.record("pcm_in", size=i)
+
+    data = tracer.to_json()
+    assert len(tracer) == 3
+    assert tracer.dropped == 2 and data["dropped"] == 2
+    assert [args["size"] for _, _, args in data["events"]] == [2, 3, 4]
+    timestamps = [ts for ts, _, _ in data["events"]]
+    assert timestamps == sorted(timestamps)
+
+
+def test_chrome_trace_pairs_spans_and_marks_instants():
+    tracer = SessionTracer("s", buffer_size=16)
+    tracer.record("pcm_in", size=3200)
+    tracer.record("correction_start", len=4)
+    tracer.record("frame_out", len=4, is_final=False)
+    tracer.record("correction_end")
+    tracer.record("close")
+
+    trace = tracer.to_chrome_trace()
+    events = trace["traceEvents"]
+    assert [(e["name"], e["ph"]) for e in events] == [
+        ("pcm_in", "i"),
+        ("correction", "B"),
+        ("frame_out", "i"),
+        ("correction", "E"),
+        ("close", "i"),
+    ]
+    assert all(e["s"] == "t" for e in events if e["ph"] == "i")
+    assert events[0]["args"] == {"size": 3200}
+    assert "args" not in events[3]
+    begin, end = events[1], events[3]
+    assert (begin["pid"], begin["tid"]) == (end["pid"], end["tid"])
+    assert begin["ts"] <= end["ts"]
+    assert trace["otherData"]["session_id"] == "s"
+
+
+@pytest.fixture
+def clean_traces(monkeypatch):
+    monkeypatch.setattr(session_trace, "_traces", OrderedDict())
+
+
+def test_start_session_samples_and_evicts_oldest(clean_traces, monkeypatch):
+    monkeypatch.setattr(settings, "transcribe_trace_sample_rate", 0.0)
+    assert session_trace.start_session() is NULL_TRACER
+    assert session_trace.list_traces() == []
+
+    monkeypatch.setattr(settings, "transcribe_trace_sample_rate", 1.0)
+    monkeypatch.setattr(settings, "transcribe_trace_keep_sessions", 2)
+    ids = [session_trace.start_session().session_id for _ in range(3)]
+
+    assert [t["session_id"] for t in session_trace.list_traces()] == [ids[2], ids[1]]
+    assert session_trace.get_trace(ids[0]) is None
+    assert session_trace.get_trace(ids[2]).session_id == ids[2]
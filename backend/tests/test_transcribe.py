@@ -0,0 +1,98 @@
+"""POST /api/v1/transcribe：stream=true 的 NDJSON 事件序列。"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.models.transcription import TranscriptionRecord
+from app.schemas.transcription import TranscribeResult
+from app.services import ark_correction, volcengine
+
+
+def _fake_iter(pieces: list[str] | Exception):
+    async def transcribe_volcengine_iter(audio_path, *, effect=False):
+        if isinstance(pieces, Exception):
+            raise pieces
+        for p in pieces:
+            yield p
+
+    return transcribe_volcengine_iter
+
+
+def _post_stream(use_llm: bool = False) -> list[dict]:
+    client = TestClient(app)
+    resp = client.post(
+        "/api/v1/transcribe",
+        params={"stream": "true", "use_llm": str(use_llm).lower()},
+        files={"audio": ("a.wav", b"RIFF", "audio/wav")},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_stream_event_sequence(temp_db, monkeypatch):
+    monkeypatch.setattr(volcengine, "transcribe_volcengine_iter", _fake_iter(["你好。", "世界"]))
+    monkeypatch.setattr(settings.volcengine, "ark_api_key", "")
+
+    events = _post_stream()
+
+    assert [e["event"] for e in events] == ["asr", "asr", "result"]
+    assert events[0]["text"] == "你好。"
+    assert events[1]["text"] == "你好。世界"
+    record = events[-1]["record"]
+    assert record["text"] == "你好。世界"
+    assert record["engine"] == "volcengine"
+    assert "event" in record  # 记录自身的环境音标签不会覆盖事件类型
+    with temp_db() as db:
+        assert db.get(TranscriptionRecord, record["id"]).text == "你好。世界"
+
+
+def test_stream_with_correction(temp_db, monkeypatch):
+    async def correct_full(text, history="", following=""):
+        return f"[{text}]"
+
+    monkeypatch.setattr(volcengine, "transcribe_volcengine_iter", _fake_iter(["你好世界"]))
+    monkeypatch.setattr(ark_correction, "correct_full", correct_full)
+    monkeypatch.setattr(settings.volcengine, "ark_api_key", "k")
+    monkeypatch.setattr(settings.volcengine, "ark_model_id", "m")
+
+    events = _post_stream(use_llm=True)
+
+    assert [e["event"] for e in events] == ["asr", "corrected", "result"]
+    assert events[1]["text"] == "[你好世界]"
+    assert events[2]["record"]["text"] == "[你好世界]"
+
+
+def test_stream_error_event(temp_db, monkeypatch):
+    monkeypatch.setattr(volcengine, "transcribe_volcengine_iter", _fake_iter(OSError("boom")))
+
+    events = _post_stream()
+
+    assert events == [{"event": "error", "detail": "boom"}]
+
+
+def test_correction_uses_hedged_asr_when_enabled(temp_db, monkeypatch):
+    async def transcribe_volcengine(audio_path, *, effect=False):
+        return TranscribeResult(text="你好世界")
+
+    async def correct_full(text, history="", following=""):
+        return f"[{text}]"
+
+    monkeypatch.setattr(volcengine, "transcribe_volcengine", transcribe_volcengine)
+    monkeypatch.setattr(volcengine, "transcribe_volcengine_iter", _fake_iter(OSError("unhedged")))
+    monkeypatch.setattr(ark_correction, "correct_full", correct_full)
+    monkeypatch.setattr(settings.asr_hedge, "enabled", True)
+    monkeypatch.setattr(settings.volcengine, "ark_api_key", "k")
+    monkeypatch.setattr(settings.volcengine, "ark_model_id", "m")
+
+    resp = TestClient(app).post(
+        "/api/v1/transcribe",
+        params={"use_llm": "true"},
+        files={"audio": ("a.wav", b"RIFF", "audio/wav")},
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["text"] == "[你好世界]"
@@ -0,0 +1,60 @@
+"""实时转写下发帧编码：全文协议与增量协议。"""
+
+from app.api.v1.transcribe_ws import PROTOCOL_DELTA, PROTOCOL_FULL, TextFrameEncoder
+
+
+def _apply(text: str, frame: dict) -> str:
+    """按客户端规则应用一帧：offset 为 UTF-16 码元下标（同 Dart / JS）。"""
+    if frame["op"] == "snapshot":
+        return frame["text"]
+    units = text.encode("utf-16-le")[: frame["offset"] * 2]
+    return units.decode("utf-16-le") + frame["text"]
+
+
+def test_full_protocol_sends_whole_text():
+    enc = TextFrameEncoder(PROTOCOL_FULL)
+    assert enc.encode("你好") == {"text": "你好", "is_final": False}
+    assert enc.encode("你好世界", is_final=True) == {"text": "你好世界", "is_final": True}
+
+
+def test_delta_protocol_reconstructs_text():
+    enc = TextFrameEncoder(PROTOCOL_DELTA, snapshot_interval=100)
+    client = ""
+    for text in [
+        "你好",
+        "你好世界",
+        "你好，世界",
+        "你好，世界！再见",
+        "你好😀",
+        "你好😀世界",
+        "你好😀世",
+        "x",
+        "",
+    ]:
+        client = _apply(client, enc.encode(text))
+        assert client == text
+
+
+def test_delta_frames_carry_only_changed_suffix():
+    enc = TextFrameEncoder(PROTOCOL_DELTA, snapshot_interval=100)
+    assert enc.encode("你好")["op"] == "snapshot"
+    frame = enc.encode("你好世界")
+    assert frame == {"seq": 2, "op": "delta", "offset": 2, "text": "世界", "is_final": False}
+
+
+def test_delta_offset_counts_utf16_code_units():
+    enc = TextFrameEncoder(PROTOCOL_DELTA, snapshot_interval=100)
+    enc.encode("😀a")
+    frame = enc.encode("😀ab")
+    assert frame["offset"] == 3 and frame["text"] == "b"
+
+
+def test_periodic_final_and_forced_snapshots():
+    enc = TextFrameEncoder(PROTOCOL_DELTA, snapshot_interval=3)
+    ops = [enc.encode("a" * i)["op"] for i in range(1, 6)]
+    assert ops == ["snapshot", "delta", "delta", "snapshot", "delta"]
+    enc.force_snapshot()
+    assert enc.encode("b")["op"] == "snapshot"
+    final = enc.encode("bc", is_final=True)
+    assert final["op"] == "snapshot" and final["is_final"] is True
+    assert final["seq"] == 7
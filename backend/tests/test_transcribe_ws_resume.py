@@ -0,0 +1,153 @@
+"""实时转写可恢复会话：token、续传偏移、接管半开连接、过期、断开期间结束后补发最终帧、主动关闭。"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.api.v1 import transcribe_ws
+from app.config import settings
+from app.main import app
+
+URL = "/api/v1/transcribe/stream"
+
+
+class FakeUpstream:
+    """回显式上游：累计收到的 PCM 作为识别全文；收到 "!" 后延迟片刻给出最终结果并结束。"""
+
+    def __init__(self) -> None:
+        self.ended = False
+
+    async def __call__(self, audio_stream, *, effect=False, tracer=None):
+        text = ""
+        async for chunk in audio_stream:
+            text += chunk.decode()
+            if text.endswith("!"):
+                await asyncio.sleep(0.3)
+                yield text
+                return
+            yield text
+        self.ended = True
+
+
+def _wait_for(cond, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeUpstream()
+    monkeypatch.setattr(transcribe_ws.volcengine, "transcribe_volcengine_stream", fake)
+    monkeypatch.setattr(transcribe_ws, "CORRECTION_WINDOW_SEC", 0.02)
+    monkeypatch.setattr(transcribe_ws, "CHECK_INTERVAL_CAP_SEC", 0.02)
+    monkeypatch.setattr(settings.volcengine, "ark_api_key", "")
+    monkeypatch.setattr(settings, "transcribe_ws_resume_grace_sec", 5)
+    monkeypatch.setattr(main, "init_db", lambda: None)
+    yield fake
+    transcribe_ws._sessions.clear()
+
+
+@pytest.fixture
+def client(upstream):
+    with TestClient(app) as c:
+        yield c
+
+
+def _open(client, **params):
+    query = "&".join(f"{k}={v}" for k, v in {"idle_timeout_sec": 600, **params}.items())
+    return client.websocket_connect(f"{URL}?{query}")
+
+
+def _detached(token: str) -> bool:
+    session = transcribe_ws._sessions.get(token)
+    return session is not None and session.pipeline.ws is None
+
+
+def test_resume_after_abnormal_drop(client, upstream):
+    with _open(client, resumable="true") as ws1:
+        first = ws1.receive_json()
+        token = first["session"]
+        assert first["resume_offset"] == 0
+        ws1.send_bytes(b"ab")
+        assert ws1.receive_json() == {"text": "ab", "is_final": False}
+        ws1.close(code=1006)
+        _wait_for(lambda: _detached(token))
+
+    with _open(client, session_token=token) as ws2:
+        assert ws2.receive_json() == {"session": token, "resume_offset": 2}
+        assert ws2.receive_json() == {"text": "ab", "is_final": False}
+        ws2.send_bytes(b"cd")
+        assert ws2.receive_json() == {"text": "abcd", "is_final": False}
+        ws2.close(code=1005)
+
+    # 主动关闭：不再可恢复，上游收到音频结束
+    _wait_for(lambda: upstream.ended)
+    assert token not in transcribe_ws._sessions
+
+
+def test_takeover_of_half_open_socket(client):
+    with _open(client, resumable="true") as ws1:
+        token = ws1.receive_json()["session"]
+        ws1.send_bytes(b"ab")
+        assert ws1.receive_json()["text"] == "ab"
+
+        with _open(client, session_token=token) as ws2:
+            assert ws2.receive_json() == {"session": token, "resume_offset": 2}
+            assert ws2.receive_json()["text"] == "ab"
+            ws1.send_bytes(b"XX")  # 已被接管的旧连接，数据应丢弃
+            ws2.send_bytes(b"cd")
+            assert ws2.receive_json()["text"] == "abcd"
+            assert transcribe_ws._sessions[token].bytes_received == 4
+
+
+def test_grace_expiry(client, monkeypatch):
+    monkeypatch.setattr(settings, "transcribe_ws_resume_grace_sec", 0.1)
+    with _open(client, resumable="true") as ws1:
+        token = ws1.receive_json()["session"]
+        ws1.close(code=1006)
+        _wait_for(lambda: token not in transcribe_ws._sessions)
+
+    with _open(client, session_token=token) as ws2:
+        assert ws2.receive_json() == {"closed": True, "reason": "session_expired"}
+
+
+def test_final_frame_replayed_after_finishing_while_detached(client):
+    with _open(client, resumable="true") as ws1:
+        token = ws1.receive_json()["session"]
+        ws1.send_bytes(b"ab")
+        assert ws1.receive_json()["text"] == "ab"
+        ws1.send_bytes(b"!")  # 上游 0.3s 后给出最终结果并结束
+        ws1.close(code=1006)
+        _wait_for(lambda: _detached(token))
+        _wait_for(lambda: transcribe_ws._sessions[token].run_task.done())
+
+    assert token in transcribe_ws._sessions
+    with _open(client, session_token=token) as ws2:
+        assert ws2.receive_json() == {"session": token, "resume_offset": 3}
+        assert ws2.receive_json() == {"text": "ab!", "is_final": True}
+    _wait_for(lambda: token not in transcribe_ws._sessions)
+
+
+def test_pcm_in_traced_on_arrival_for_attached_socket_only(client, monkeypatch):
+    monkeypatch.setattr(settings, "transcribe_trace_sample_rate", 1.0)
+    with _open(client, resumable="true") as ws1:
+        token = ws1.receive_json()["session"]
+        tracer = transcribe_ws._sessions[token].pipeline.tracer
+        ws1.send_bytes(b"ab")
+        assert ws1.receive_json()["text"] == "ab"
+
+        with _open(client, session_token=token) as ws2:
+            ws2.receive_json()
+            ws2.receive_json()
+            ws1.send_bytes(b"XX")
+            ws2.send_bytes(b"cde")
+            assert ws2.receive_json()["text"] == "abcde"
+
+    sizes = [args["size"] for _, name, args in tracer.to_json()["events"] if name == "pcm_in"]
+    assert sizes == [2, 3]
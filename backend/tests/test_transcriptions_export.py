@@ -0,0 +1,94 @@
+"""GET /api/v1/transcriptions/export：过滤条件、跨批分页、NDJSON / CSV 输出。"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.transcriptions import EXPORT_BATCH_SIZE, EXPORT_FIELDS
+from app.main import app
+from app.models.transcription import TranscriptionRecord
+
+URL = "/api/v1/transcriptions/export"
+
+
+def _add(session_local, rows: list[dict]) -> None:
+    with session_local() as db:
+        db.add_all(TranscriptionRecord(**row) for row in rows)
+        db.commit()
+
+
+def _get(**params):
+    resp = TestClient(app).get(URL, params=params)
+    assert resp.status_code == 200
+    return resp
+
+
+def _ndjson(**params) -> list[dict]:
+    return [json.loads(line) for line in _get(**params).text.splitlines()]
+
+
+def test_export_crosses_batch_boundary(temp_db):
+    total = EXPORT_BATCH_SIZE * 2 + 3
+    _add(temp_db, [{"engine": "volcengine", "text": f"t{i}"} for i in range(total)])
+
+    items = _ndjson()
+
+    assert [item["id"] for item in items] == list(range(1, total + 1))
+    assert items[EXPORT_BATCH_SIZE]["text"] == f"t{EXPORT_BATCH_SIZE}"
+    assert list(items[0]) == EXPORT_FIELDS
+
+
+def test_export_filters(temp_db):
+    _add(
+        temp_db,
+        [
+            {"engine": "volcengine", "text": "a", "created_at": datetime(2024, 1, 1, 12)},
+            {"engine": "volcengine", "text": "b", "created_at": datetime(2024, 1, 2, 12)},
+            {"engine": "other", "text": "c", "created_at": datetime(2024, 1, 2, 13)},
+            {"engine": "volcengine", "text": "d", "created_at": datetime(2024, 1, 3)},
+        ],
+    )
+
+    def texts(**params) -> list[str]:
+        return [item["text"] for item in _ndjson(**params)]
+
+    assert texts(engine="volcengine") == ["a", "b", "d"]
+    # start 含、end 不含
+    assert texts(start="2024-01-02T12:00:00", end="2024-01-03T00:00:00") == ["b", "c"]
+    # 带时区的参数换算为 UTC 后比较
+    assert texts(start="2024-01-02T20:00:00+08:00", engine="volcengine") == ["b", "d"]
+    assert texts(engine="missing") == []
+
+
+def test_export_csv(temp_db):
+    _add(
+        temp_db,
+        [
+            {"engine": "volcengine", "text": "你好，\"世界\"\n换行", "lang": "zh", "audio_size": 3200},
+            {"engine": "volcengine", "text": "b"},
+        ],
+    )
+
+    resp = _get(format="csv")
+
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert 'filename="transcriptions.csv"' in resp.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert list(rows[0]) == EXPORT_FIELDS
+    assert [(r["id"], r["text"], r["lang"], r["audio_size"]) for r in rows] == [
+        ("1", "你好，\"世界\"\n换行", "zh", "3200"),
+        ("2", "b", "", ""),
+    ]
+    assert rows[0]["created_at"]
+
+
+def test_export_ndjson_headers_and_invalid_format(temp_db):
+    _add(temp_db, [{"engine": "volcengine", "text": "a"}])
+
+    resp = _get()
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="transcriptions.ndjson"' in resp.headers["content-disposition"]
+    assert TestClient(app).get(URL, params={"format": "xml"}).status_code == 422